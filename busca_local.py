@@ -0,0 +1,62 @@
+import numpy as np
+
+#----------------------------------------------------
+#   tabucol() - reparo de uma coloração por busca tabu
+#----------------------------------------------------
+
+# Busca tabu no estilo TabuCol sobre uma coloração completa com k cores.
+# cont_cores[v][c] (quantos vizinhos de v têm a cor c; State guarda a
+# transposta) é mantida incrementalmente: mudar a cor de v de a para b custa
+# cont_cores[v][b] - cont_cores[v][a] conflitos. A cada iteração é feito o
+# melhor movimento não tabu de um vértice em conflito (ou um tabu que
+# melhore o melhor resultado, critério de aspiração); a cor antiga do
+# vértice fica tabu por L + 0.6 * |vértices em conflito| iterações.
+# Os vértices em fixos (se houver) nunca mudam de cor.
+# Devolve (conflitos, cores) da melhor coloração encontrada.
+def tabucol(graph, k, cores, iteracoes, rng, deadline=None, fixos=None):
+    n = graph.number_of_nodes()
+    cores = np.array(cores, dtype=np.int32)
+    todos = np.arange(n)
+    cont_cores = np.zeros((n, k), dtype=np.int32)
+    np.add.at(cont_cores, (graph.origem, cores[graph.destino]), 1)
+    np.add.at(cont_cores, (graph.destino, cores[graph.origem]), 1)
+    conflitos = int(cont_cores[todos, cores].sum()) // 2
+    tabu = np.zeros((n, k), dtype=np.int64)  # iteração até a qual (v, c) é tabu
+    movel = np.ones(n, dtype=bool)
+    if fixos is not None:
+        movel[fixos] = False
+
+    melhor = conflitos
+    melhores_cores = cores.copy()
+    for it in range(iteracoes):
+        if conflitos == 0 or (deadline is not None and deadline.expired()):
+            break
+        em_conflito = np.flatnonzero((cont_cores[todos, cores] > 0) & movel)
+        if len(em_conflito) == 0:
+            break
+        atuais = cont_cores[em_conflito, cores[em_conflito]]
+        delta = cont_cores[em_conflito] - atuais[:, None]
+        delta[np.arange(len(em_conflito)), cores[em_conflito]] = np.iinfo(np.int32).max
+        proibido = (tabu[em_conflito] > it) & (conflitos + delta >= melhor)
+        delta[proibido] = np.iinfo(np.int32).max
+        menor = delta.min()
+        if menor == np.iinfo(np.int32).max:
+            continue
+        # desempate aleatório entre os melhores movimentos
+        linhas, colunas = np.nonzero(delta == menor)
+        escolha = rng.integers(len(linhas))
+        vertex = int(em_conflito[linhas[escolha]])
+        nova = int(colunas[escolha])
+        antiga = int(cores[vertex])
+
+        neighbors = graph[vertex]
+        cont_cores[neighbors, antiga] -= 1
+        cont_cores[neighbors, nova] += 1
+        cores[vertex] = nova
+        conflitos += int(menor)
+        tabu[vertex, antiga] = it + int(rng.integers(10)) + int(0.6 * len(em_conflito))
+
+        if conflitos < melhor:
+            melhor = conflitos
+            melhores_cores[:] = cores
+    return melhor, melhores_cores
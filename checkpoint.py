@@ -0,0 +1,25 @@
+import json
+import os
+import numpy as np
+
+#----------------------------------------------------
+#   checkpoint - gravação e leitura do estado de uma busca
+#----------------------------------------------------
+
+# O checkpoint é um único arquivo .npz comprimido: os arrays (políticas,
+# melhores sequências e máscaras) vão como estão e os demais valores
+# (contadores, estado do gerador aleatório, ...) vão em JSON no campo meta.
+
+def salva(caminho, meta: dict, arrays: dict):
+    # grava em um arquivo temporário e renomeia, para que uma interrupção
+    # no meio da gravação não estrague o checkpoint anterior
+    tmp = f"{caminho}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp, caminho)
+
+def carrega(caminho):
+    with np.load(caminho, allow_pickle=False) as dados:
+        meta = json.loads(str(dados["meta"]))
+        arrays = {nome: dados[nome] for nome in dados.files if nome != "meta"}
+    return meta, arrays
@@ -0,0 +1,42 @@
+import numpy as np
+
+# número de vértices de maior grau usados como ponto de partida
+PARTIDAS = 10
+
+#----------------------------------------------------
+#   clique_gulosa() - clique grande encontrada de forma gulosa
+#----------------------------------------------------
+
+# A partir de cada um dos PARTIDAS vértices de maior grau, a clique
+# cresce com o candidato (vizinho de todos os vértices já escolhidos) que
+# tem mais vizinhos entre os demais candidatos. Devolve a maior clique
+# encontrada, em ordem de inclusão; o seu tamanho é um limite inferior
+# do número cromático.
+def clique_gulosa(graph, partidas=PARTIDAS):
+    n = graph.number_of_nodes()
+    melhor = np.empty(0, dtype=np.int64)
+    for inicio in np.argsort(-graph.graus, kind='stable')[:partidas].tolist():
+        clique = [inicio]
+        candidatos = graph[inicio]
+        # internos[v]: vizinhos de v entre os candidatos, atualizado a
+        # cada candidato descartado
+        internos = np.bincount(vizinhos_de(graph, candidatos), minlength=n)
+        while len(candidatos):
+            escolhido = int(candidatos[np.argmax(internos[candidatos])])
+            clique.append(escolhido)
+            fica = np.isin(candidatos, graph[escolhido], assume_unique=True)
+            internos -= np.bincount(vizinhos_de(graph, candidatos[~fica]), minlength=n)
+            candidatos = candidatos[fica]
+        if len(clique) > len(melhor):
+            melhor = np.array(clique, dtype=np.int64)
+    return melhor
+
+# listas de adjacência dos vértices dados, concatenadas
+def vizinhos_de(graph, vertices):
+    graus = graph.graus[vertices]
+    fim = np.cumsum(graus)
+    if len(fim) == 0:
+        return np.empty(0, dtype=graph.vizinhos.dtype)
+    posicoes = (np.arange(fim[-1]) - np.repeat(fim - graus, graus)
+                + np.repeat(graph.offsets[vertices], graus))
+    return graph.vizinhos[posicoes]
@@ -0,0 +1,159 @@
+#!/bin/env python3
+
+import sys, os
+import json
+import time
+import platform
+import argparse
+import numpy as np
+
+# os módulos do solver ficam no diretório acima deste script
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+import read_dimacs
+import solver
+
+INSTANCIAS = [os.path.join(RAIZ, 'grafos', 'instancias-grupo1.txt'),
+              os.path.join(RAIZ, 'grafos', 'instancias-grupo2.txt')]
+
+ORCAMENTO = 1.0   # segundos de cada medida de vazão (playouts, adapt)
+TEMPO_SOLUCAO = 10.0  # limite de tempo de cada busca por coloração válida
+
+#----------------------------------------------------
+#   benchmark - medidas de desempenho do solver
+#----------------------------------------------------
+
+# Para cada instância mede: tempo de leitura do grafo (sem e com o cache),
+# playouts por segundo, chamadas de adapt por segundo e o tempo até uma
+# coloração válida com χ e χ+1 cores. Tudo com sementes fixas e limites
+# curtos, para que o relatório JSON de duas versões do código possa ser
+# comparado (--baseline).
+
+# lê as linhas "arquivo χ" de um arquivo de instâncias
+def le_instancias(fname):
+    base = os.path.dirname(os.path.abspath(fname))
+    instancias = []
+    with open(fname) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 2:
+                instancias.append((os.path.join(base, parts[0]), int(parts[1])))
+    return instancias
+
+# repete f() até esgotar orcamento segundos; devolve chamadas por segundo
+def vazao(f, orcamento):
+    chamadas = 0
+    inicio = time.perf_counter()
+    while True:
+        f()
+        chamadas += 1
+        decorrido = time.perf_counter() - inicio
+        if decorrido >= orcamento:
+            return chamadas / decorrido
+
+def mede_leitura(fname):
+    inicio = time.perf_counter()
+    read_dimacs.read_graph(fname, cache=False)
+    sem_cache = time.perf_counter() - inicio
+    read_dimacs.read_graph(fname)  # garante que o cache existe
+    inicio = time.perf_counter()
+    graph = read_dimacs.read_graph(fname)
+    com_cache = time.perf_counter() - inicio
+    return graph, sem_cache, com_cache
+
+def mede_playouts(graph, k, seed, orcamento):
+    state = solver.State(graph, k)
+    policy = np.zeros((graph.number_of_nodes(), k))
+    rng = np.random.default_rng(seed)
+    def um_playout():
+        state.initial_state()
+        solver.playout(state, policy, rng)
+    return vazao(um_playout, orcamento)
+
+def mede_adapt(graph, k, seed, orcamento):
+    state = solver.State(graph, k)
+    policy = np.zeros((graph.number_of_nodes(), k))
+    state.initial_state()
+    _, sequence, masks = solver.playout(state, policy, np.random.default_rng(seed))
+    return vazao(lambda: solver.adapt(policy, sequence, masks), orcamento)
+
+# tempo até uma coloração válida (None se o limite esgotou)
+def mede_solucao(graph, k, seed, tempo):
+    resultado = solver.solve(graph, k, "nrpa", tempo, seed=seed, target_score=0)
+    return {"k": k,
+            "valid": bool(resultado.valid),
+            "seconds": resultado.seconds if resultado.valid else None,
+            "score": int(resultado.score),
+            "playouts": resultado.playouts}
+
+def mede_instancia(fname, chi, args):
+    graph, sem_cache, com_cache = mede_leitura(fname)
+    return {"instance": os.path.basename(fname),
+            "chi": chi,
+            "n": graph.number_of_nodes(),
+            "m": graph.number_of_edges(),
+            "load_seconds": sem_cache,
+            "load_cached_seconds": com_cache,
+            "playouts_per_second": mede_playouts(graph, chi, args.seed, args.budget),
+            "adapt_per_second": mede_adapt(graph, chi, args.seed, args.budget),
+            "solve": [mede_solucao(graph, k, args.seed, args.solve_time)
+                      for k in (chi + 1, chi)]}
+
+def cabecalho(args):
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "budget": args.budget,
+            "solve_time": args.solve_time}
+
+# razão entre as vazões deste relatório e as de um relatório anterior
+def compara(relatorio, baseline):
+    anteriores = {r["instance"]: r for r in baseline["instances"]}
+    print(f'{"instância":<25} {"leitura":>8} {"playouts":>9} {"adapt":>8}')
+    for r in relatorio["instances"]:
+        b = anteriores.get(r["instance"])
+        if b is None:
+            continue
+        print(f'{r["instance"]:<25} '
+              f'{b["load_seconds"] / r["load_seconds"]:>7.2f}x '
+              f'{r["playouts_per_second"] / b["playouts_per_second"]:>8.2f}x '
+              f'{r["adapt_per_second"] / b["adapt_per_second"]:>7.2f}x')
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark do solver sobre as instâncias DIMACS")
+    parser.add_argument("instancias", nargs="*", default=INSTANCIAS,
+                        help="arquivos com os grafos e o número cromático (padrão: grupos 1 e 2)")
+    parser.add_argument("--output", default="benchmark.json",
+                        help="arquivo do relatório JSON (padrão: benchmark.json)")
+    parser.add_argument("--baseline", default=None,
+                        help="relatório anterior para comparar as vazões")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=ORCAMENTO,
+                        help=f"segundos de cada medida de vazão (padrão: {ORCAMENTO})")
+    parser.add_argument("--solve-time", type=float, default=TEMPO_SOLUCAO,
+                        help=f"limite de cada busca com χ e χ+1 cores (padrão: {TEMPO_SOLUCAO})")
+    args = parser.parse_args()
+
+    relatorio = cabecalho(args)
+    relatorio["instances"] = []
+    for arquivo in args.instancias:
+        for fname, chi in le_instancias(arquivo):
+            r = mede_instancia(fname, chi, args)
+            relatorio["instances"].append(r)
+            tempos = ' '.join(f'{s["k"]}:{s["seconds"]:.2f}' if s["valid"] else f'{s["k"]}:-'
+                              for s in r["solve"])
+            print(f'{r["instance"]:<25} {r["load_seconds"]:>7.3f}s '
+                  f'{r["playouts_per_second"]:>8.1f} playouts/s '
+                  f'{r["adapt_per_second"]:>9.1f} adapt/s  {tempos}', flush=True)
+
+    with open(args.output, "w") as f:
+        json.dump(relatorio, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compara(relatorio, json.load(f))
+
+if __name__ == "__main__":
+    main()
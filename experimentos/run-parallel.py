@@ -1,10 +1,17 @@
 #!/bin/env python3
 
-import sys, os, subprocess
-import time
+import sys, os
+import multiprocessing
 import logging
 
+# os módulos do solver ficam no diretório acima deste script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import read_dimacs
+import solver
+import resultados
+
 time_limit = 0
+db = "resultados.db"  # arquivo SQLite com uma linha por execução
 
 # Configure the logging system
 logging.basicConfig(
@@ -15,43 +22,55 @@ logging.basicConfig(
         logging.StreamHandler()            # Also output to the console
     ])
 
-# executa as simulações, 
-def run_simulation(tasks, max_concurrent_tasks):
-    global time_limit
-
-    command = "../nrpa_per_time.py"
-    
-    running_tasks = [] 
-    next_task = 0
+# grafos já lidos por este processo do pool
+grafos = {}
 
-    # Start the first 'k' tasks
-    while len(running_tasks) < max_concurrent_tasks and next_task < len(tasks):
-        filename, number = tasks[next_task]
+# executa todas as repetições de um grafo com um número de cores no mesmo
+# processo, lendo o grafo uma única vez; cada linha de resultado é
+# impressa assim que a repetição termina. Um erro é registrado no log e
+# afeta só a repetição (ou, na leitura do grafo, a tarefa) em que ocorreu,
+# como quando cada execução era um subprocesso separado.
+def executa_tarefa(tarefa):
+    filename, number, repeticoes, time_limit, db = tarefa
+    if filename not in grafos:
+        try:
+            grafos[filename] = read_dimacs.read_graph(filename)
+        except Exception:
+            logging.exception(f"Could not read {filename}, skipping.")
+            return filename, number
+    graph = grafos[filename]
+    for repeticao in range(repeticoes):
         try:
-            process = subprocess.Popen([command, filename, str(number), str(time_limit)], cwd='../grafos')  
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Error occurred while running simulation for {filename}: {e}")
-        running_tasks.append(process)
-        next_task += 1
+            resultado = solver.solve(graph, number, "nrpa", time_limit)
+            print(''.join(solver.linha_resultado(filename, graph, number, resultado)), flush=True)
+            resultados.registra(db, filename, graph, number, resultado, "nrpa", time_limit=time_limit)
+        except Exception:
+            logging.exception(f"Repetition {repeticao + 1} of {filename} with {number} colors failed.")
+    return filename, number
 
-    # Monitor and replace completed tasks
-    while running_tasks:
-        for process in running_tasks:
-            retcode = process.poll()  # Check if process has finished
-            if retcode is not None:   # Process finished
-                running_tasks.remove(process)
-                # Start the next task if there are more in the list
-                if next_task < len(tasks):
-                    filename, number = tasks[next_task]
-                    process = subprocess.Popen([command, filename, str(number), str(time_limit)], cwd='../grafos')  
-                    running_tasks.append(process)
-                    next_task += 1
-        time.sleep(0.1)  # Briefly sleep to avoid busy-waiting
+# Estimativa do custo de uma tarefa para ordenar as mais longas primeiro:
+# as execuções com o número cromático são as que costumam esgotar o
+# tempo, e entre elas os grafos maiores (tamanho do arquivo) demoram mais.
+def custo_estimado(tarefa):
+    filename, number, delta_k = tarefa
+    return (delta_k == 0, os.path.getsize(filename))
+
+# executa as simulações em um pool de processos persistente; o pool é
+# encerrado assim que a última tarefa termina
+def run_simulation(tasks, repeticoes, max_concurrent_tasks):
+    tasks = sorted(tasks, key=custo_estimado, reverse=True)
+    args = [(filename, number, repeticoes, time_limit, db) for filename, number, _ in tasks]
+    with multiprocessing.Pool(max_concurrent_tasks) as pool:
+        for filename, number in pool.imap_unordered(executa_tarefa, args, chunksize=1):
+            logging.debug(f"Finished {filename} with {number} colors")
 
 def main(input_file, repeticoes, max_concurrent_tasks):
     print(f"Repetições: {repeticoes}")
-    print(f"Tempo limite por repetição: {int(time_limit/60)} minutos")
+    print(f"Tempo limite por repetição: {int(time_limit/60)} minutos", flush=True)
     
+    # os nomes dos grafos são relativos ao diretório do arquivo de entrada
+    base = os.path.dirname(os.path.abspath(input_file))
+
     # run the simulation with k+1 and k where k is the known
     # chromatic number of the graph
     tasks = []
@@ -65,9 +84,14 @@ def main(input_file, repeticoes, max_concurrent_tasks):
                         # Ensure the second part is an integer
                         try:
                             number = int(numero_de_cores) + delta_k
-                            tasks.extend([(filename, number)]*repeticoes)
                         except ValueError:
                             logging.error(f"Invalid number {numero_de_cores} for {filename}, skipping.")
+                            continue
+                        filename = os.path.join(base, filename)
+                        if not os.path.isfile(filename):
+                            logging.error(f"Graph file {filename} not found, skipping.")
+                            continue
+                        tasks.append((filename, number, delta_k))
                     else:
                         logging.error(f"Invalid input format: {line.strip()}, skipping.")
         except FileNotFoundError:
@@ -75,19 +99,20 @@ def main(input_file, repeticoes, max_concurrent_tasks):
             exit(1)
 
     # Call the simulation function with the arguments
-    run_simulation(tasks, max_concurrent_tasks)
+    run_simulation(tasks, repeticoes, max_concurrent_tasks)
         
 if __name__ == "__main__":
     nparam = len(sys.argv)
-    if nparam == 5:
+    if nparam in (5, 6):
         fname = sys.argv[1]
         repeticoes = int(sys.argv[2])
         time_limit = int(sys.argv[3])
         max_concurrent_tasks = int(sys.argv[4])
+        if nparam == 6:
+            db = sys.argv[5]
     else:
         script_name = os.path.basename(__file__)
-        print(f"usage: {script_name} <file with graphs filenames and the chromatic number> repetitions_per_graph  time_limit number_of_parallel_processes")
+        print(f"usage: {script_name} <file with graphs filenames and the chromatic number> repetitions_per_graph  time_limit number_of_parallel_processes [results.db]")
         exit(1)
 
     main(fname, repeticoes, max_concurrent_tasks)
-
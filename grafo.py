@@ -0,0 +1,84 @@
+import numpy as np
+
+#----------------------------------------------------
+#   Grafo - grafo não direcionado em formato CSR
+#----------------------------------------------------
+
+# Os vizinhos do vértice v ficam em vizinhos[offsets[v]:offsets[v+1]].
+# As arestas também são guardadas uma única vez em (origem[i], destino[i]),
+# com origem < destino, para os laços que percorrem todas as arestas.
+# Os métodos imitam a parte da interface do networkx usada pelos scripts.
+class Grafo:
+    def __init__(self, n, offsets, vizinhos, origem, destino):
+        self.n = n
+        self.offsets = offsets
+        self.vizinhos = vizinhos
+        self.origem = origem
+        self.destino = destino
+        self.graus = np.diff(offsets)
+
+    # constrói o grafo a partir de listas (ou arrays) de arestas u-v
+    # com vértices numerados de 0 a n-1; laços e arestas repetidas são
+    # descartados
+    @classmethod
+    def from_edges(cls, n, u, v):
+        u = np.asarray(u, dtype=np.int64)
+        v = np.asarray(v, dtype=np.int64)
+        menor = np.minimum(u, v)
+        maior = np.maximum(u, v)
+        chaves = np.unique(menor[menor != maior] * n + maior[menor != maior])
+        origem = (chaves // n).astype(np.int32)
+        destino = (chaves % n).astype(np.int32)
+
+        # cada aresta aparece nas listas de adjacência dos dois extremos
+        fonte = np.concatenate((origem, destino))
+        alvo = np.concatenate((destino, origem))
+        ordem = np.lexsort((alvo, fonte))
+        vizinhos = alvo[ordem]
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(fonte, minlength=n), out=offsets[1:])
+        return cls(n, offsets, vizinhos, origem, destino)
+
+    # subgrafo induzido pelos vértices dados; o i-ésimo deles vira o
+    # vértice i do subgrafo
+    def subgrafo(self, vertices):
+        vertices = np.asarray(vertices, dtype=np.int64)
+        novo = np.full(self.n, -1, dtype=np.int64)
+        novo[vertices] = np.arange(len(vertices))
+        u = novo[self.origem]
+        v = novo[self.destino]
+        dentro = (u >= 0) & (v >= 0)
+        return Grafo.from_edges(len(vertices), u[dentro], v[dentro])
+
+    def __getitem__(self, vertex):
+        return self.vizinhos[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def nodes(self):
+        return range(self.n)
+
+    def number_of_nodes(self):
+        return self.n
+
+    def number_of_edges(self):
+        return len(self.origem)
+
+    def degree(self, vertex):
+        return int(self.graus[vertex])
+
+    def neighbors(self, vertex):
+        return self[vertex]
+
+    def edges(self):
+        return zip(self.origem.tolist(), self.destino.tolist())
+
+    # networkx só é necessário para desenhar o grafo
+    def to_networkx(self):
+        import networkx as nx
+        g = nx.Graph()
+        g.add_nodes_from(range(self.n))
+        g.add_edges_from(self.edges())
+        return g
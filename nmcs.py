@@ -0,0 +1,46 @@
+#!/bin/env python3
+
+import read_dimacs
+import solver
+import resultados
+import sys
+import argparse
+
+# Nested Monte Carlo Search (solver.solve com algorithm="nmcs")
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fname", metavar="<DIMACS graph filename>")
+    parser.add_argument("max_colors", type=int, metavar="<number-of-colors>")
+    parser.add_argument("time_limit", type=float, metavar="<tempo_de_execução>") # tempo em segundos
+    parser.add_argument("verbose", nargs="?", choices=["verbose"])
+    parser.add_argument("--level", type=int, default=solver.NMCS_LEVEL,
+                        help=f"nível da busca aninhada (padrão: {solver.NMCS_LEVEL})")
+    parser.add_argument("--reduce", action="store_true",
+                        help="reduz o grafo (poda, dominação, componentes) antes da busca")
+    parser.add_argument("--clique", action="store_true",
+                        help="fixa as cores de uma clique e termina de imediato se k for menor que ela")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="semente dos geradores aleatórios (padrão: uma nova a cada execução)")
+    parser.add_argument("--db", default=None,
+                        help="arquivo SQLite onde a execução é registrada (ver resultados.py)")
+    args = parser.parse_args()
+    fname = args.fname
+
+    try:
+        graph = read_dimacs.read_graph(fname)
+    except:
+        print(f"Cound not open the graph. File {fname} not found.", file=sys.stderr)
+        exit(1)
+
+    resultado = solver.solve(graph, args.max_colors, "nmcs", args.time_limit,
+                             level=args.level, seed=args.seed,
+                             stats=args.verbose is not None, reduce=args.reduce,
+                             clique=args.clique)
+    solver.imprime_resultado(fname, graph, args.max_colors, resultado, args.verbose)
+    if args.db:
+        resultados.registra(args.db, fname, graph, args.max_colors, resultado, "nmcs",
+                            time_limit=args.time_limit, level=args.level, reduce=args.reduce,
+                            clique=args.clique)
+
+if __name__ == "__main__":
+    main()
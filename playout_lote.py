@@ -0,0 +1,53 @@
+import numpy as np
+
+#----------------------------------------------------
+#   playout_lote() - vários playouts em paralelo com NumPy
+#----------------------------------------------------
+
+# Avança batch playouts ao mesmo tempo, todos na mesma ordem de vértices
+# (grau decrescente, a ordem inicial de FilaVertices). As cores ficam em
+# uma matriz batch x n e a contagem de cores dos vizinhos em um array
+# batch x n x max_colors, de modo que cada passo sorteia a cor do vértice
+# para todos os playouts de uma vez.
+# Devolve o melhor dos playouts no mesmo formato de playout():
+# (score, sequência, máscaras das cores legais de cada passo).
+# fixos são movimentos (vértice, cor) já feitos antes do playout, sem
+# conflitos entre si (ver State.fixa); não entram na sequência devolvida.
+def playout_lote(policy: np.ndarray, graph, batch: int, rng, ordem=None, fixos=None):
+    n, k = policy.shape
+    if ordem is None:
+        ordem = np.argsort(-graph.graus, kind='stable')
+    linhas = np.arange(batch)
+
+    cores = np.full((batch, n), -1, dtype=np.int32)
+    cont_cores = np.zeros((batch, n, k), dtype=np.int32)
+    if fixos is not None and len(fixos):
+        for vertex, color in fixos.tolist():
+            cores[:, vertex] = color
+            cont_cores[:, graph[vertex], color] += 1
+        livre = np.ones(n, dtype=bool)
+        livre[fixos[:, 0]] = False
+        ordem = ordem[livre[ordem]]
+    conflitos = np.zeros(batch, dtype=np.int64)
+    masks = np.empty((batch, len(ordem), k), dtype=bool)
+
+    for step, vertex in enumerate(ordem.tolist()):
+        cont = cont_cores[:, vertex, :]
+        mask = cont == 0
+        mask[~mask.any(axis=1)] = True
+        masks[:, step] = mask
+
+        # sorteio de Gibbs pelo truque de Gumbel-max: argmax de
+        # policy + ruído de Gumbel tem a mesma distribuição do softmax
+        pesos = policy[vertex] + rng.gumbel(size=(batch, k))
+        pesos[~mask] = -np.inf
+        color = pesos.argmax(axis=1)
+
+        conflitos += cont[linhas, color]
+        cores[:, vertex] = color
+        neighbors = graph[vertex]
+        cont_cores[linhas[:, None], neighbors[None, :], color[:, None]] += 1
+
+    best = int(np.argmin(conflitos))
+    sequence = np.column_stack((ordem, cores[best, ordem])).astype(np.int32)
+    return -int(conflitos[best]), sequence, masks[best]
@@ -20,7 +20,8 @@ def main():
 
     print(f"Nodes: {graph.number_of_nodes()}, edges: {graph.number_of_edges()}")
 
-    nx.draw(graph, pos=nx.spring_layout(graph),  with_labels=True)
+    g = graph.to_networkx()
+    nx.draw(g, pos=nx.spring_layout(g),  with_labels=True)
 
     #    nx.draw_shell(graph, nlist=[range(5, 10), range(5)], with_labels=True, font_weight='bold')
     plt.show()
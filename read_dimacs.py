@@ -1,4 +1,22 @@
-import networkx as nx
+import hashlib
+import os
+import re
+import numpy as np
+from grafo import Grafo
+
+# diretório do cache dos grafos já lidos; pode ser trocado pela variável
+# de ambiente NRPA_CACHE (um valor vazio desliga o cache)
+CACHE_DIR = os.environ.get("NRPA_CACHE",
+                           os.path.join(os.path.expanduser("~"), ".cache", "nmcs-nrpa"))
+
+# versão do formato do cache; incrementar quando Grafo mudar
+VERSAO_CACHE = 1
+
+# arrays guardados no cache, um arquivo .npy para cada
+CAMPOS = ("offsets", "vizinhos", "origem", "destino")
+
+LINHA_P = re.compile(rb"^p\s+\S+\s+(\d+)\s+(\d+)", re.M)
+LINHA_E = re.compile(rb"^[ae][ \t]+(\d+)[ \t]+(\d+)", re.M)
 
 #----------------------------------------------------
 #   read_dimacs() - read a dimacs graph
@@ -6,31 +24,72 @@ import networkx as nx
 
 # assume que os vértices são numerados de 1 a n no arquivo
 # mas internamente nomeia-os com números de 0 a n-1
-def read_graph(fname):
-    try:
-        f = open(fname, "r")
-    except:
-        raise
-    g = nx.Graph()
-    for line in f:
-        if line[0] == 'c':
-            continue
-        if line[0] == 'p':
-            scan = line.split()
-            n = int(scan[2])
-            m = int(scan[3])
-            g.add_nodes_from(range(n))
-        if line[0] in 'ae':
-            scan = line.split()
-            u = int(scan[1])-1
-            v = int(scan[2])-1
-            # print(f"e {u} {v}")
-            # weight = float(scan[3])
-            if not g.has_edge(u,v):
-                g.add_edge(u, v)
-                #g.add_edge(u, v, weight=weight)
-            #else:
-            #    g[u][v]['weight'] += weight
-    # print(f'Read dimacs graph with {g.number_of_nodes()} node and {g.number_of_edges()} edges')
-    f.close()
+def read_graph(fname, cache=True):
+    with open(fname, "rb") as f:
+        data = f.read()
+
+    if not cache or not CACHE_DIR:
+        return parse_graph(data)
+
+    chave = hashlib.sha1(data).hexdigest()
+    pasta = os.path.join(CACHE_DIR, f"v{VERSAO_CACHE}-{chave}")
+    g = load_cache(pasta)
+    if g is None:
+        g = parse_graph(data)
+        save_cache(pasta, g)
+        # relê do cache para que processos paralelos compartilhem as
+        # mesmas páginas mapeadas em memória
+        mapeado = load_cache(pasta)
+        if mapeado is not None:
+            g = mapeado
     return g
+
+# lê todas as linhas 'e u v' de uma vez com expressões regulares e
+# converte os números em bloco; arestas repetidas são descartadas na
+# construção do grafo (ordenação das arestas)
+def parse_graph(data):
+    p = LINHA_P.search(data)
+    if p is None:
+        raise ValueError("DIMACS file without a 'p' line")
+    n = int(p.group(1))
+    arestas = LINHA_E.findall(data)
+    if arestas:
+        arestas = np.array(arestas).astype(np.int64) - 1
+    else:
+        arestas = np.empty((0, 2), dtype=np.int64)
+    # print(f'Read dimacs graph with {n} node and {len(arestas)} edges')
+    return Grafo.from_edges(n, arestas[:, 0], arestas[:, 1])
+
+def load_cache(pasta):
+    # view(np.ndarray): as fatias graph[v] do caminho quente saem como
+    # ndarray comuns (a subclasse memmap deixa os playouts ~10% mais
+    # lentos), ainda sobre as mesmas páginas mapeadas
+    try:
+        arrays = [np.load(os.path.join(pasta, f"{campo}.npy"), mmap_mode="r").view(np.ndarray)
+                  for campo in CAMPOS]
+    except (OSError, ValueError):
+        return None
+    offsets, vizinhos, origem, destino = arrays
+    return Grafo(len(offsets) - 1, offsets, vizinhos, origem, destino)
+
+# grava em um diretório temporário e renomeia, para que processos
+# concorrentes nunca vejam um cache incompleto
+def save_cache(pasta, g):
+    tmp = f"{pasta}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp, exist_ok=True)
+        for campo in CAMPOS:
+            np.save(os.path.join(tmp, f"{campo}.npy"), getattr(g, campo))
+        os.replace(tmp, pasta)
+    except OSError:
+        # outro processo já gravou o mesmo grafo ou o diretório não é
+        # gravável: o cache é apenas uma otimização
+        for campo in CAMPOS:
+            try:
+                os.remove(os.path.join(tmp, f"{campo}.npy"))
+            except OSError:
+                pass
+        try:
+            os.rmdir(tmp)
+        except OSError:
+            pass
@@ -0,0 +1,120 @@
+import numpy as np
+
+# acima deste número de vértices não se procura vértices dominados (a
+# busca usa a matriz de adjacência densa)
+MAX_DOMINACAO = 5000
+
+#----------------------------------------------------
+#   reduz() - redução do grafo antes da busca por k cores
+#----------------------------------------------------
+
+# Três reduções que não mudam a existência de uma k-coloração:
+# 1. poda: um vértice com menos de k vizinhos sempre tem uma cor livre,
+#    então sai do grafo e é colorido por último, de forma gulosa;
+# 2. dominação: se u e v não são vizinhos e N(u) está contido em N(v), u
+#    sai do grafo e recebe a cor de v;
+# 3. componentes: o que sobra (o núcleo) é dividido em componentes
+#    conexas, resolvidas de forma independente.
+# A poda e a dominação se alimentam (cada remoção diminui graus e
+# vizinhanças) e são repetidas até que nada mais saia.
+class Reducao:
+    def __init__(self, graph, k, passos, nucleo, componentes):
+        self.graph = graph
+        self.k = k
+        self.passos = passos            # (vértice, -1 se podado ou o dominante)
+        self.nucleo = nucleo            # vértices do núcleo (ids originais)
+        self.componentes = componentes  # vértices de cada componente do núcleo
+
+    # fração dos vértices que continuam no núcleo
+    def razao(self):
+        n = self.graph.number_of_nodes()
+        return len(self.nucleo) / n if n else 0.0
+
+    # completa uma coloração do núcleo (cores[v] == -1 fora dele),
+    # desfazendo as remoções da última para a primeira; devolve também a
+    # ordem em que os vértices removidos foram coloridos
+    def levanta(self, cores):
+        cores = np.array(cores, dtype=np.int32)
+        ordem = []
+        for vertex, dominante in reversed(self.passos):
+            if dominante >= 0:
+                cores[vertex] = cores[dominante]
+            else:
+                usadas = cores[self.graph[vertex]]
+                contagem = np.bincount(usadas[usadas >= 0], minlength=self.k)[:self.k]
+                cores[vertex] = int(np.argmin(contagem))
+            ordem.append(vertex)
+        return cores, ordem
+
+def reduz(graph, k) -> Reducao:
+    n = graph.number_of_nodes()
+    vivo = np.ones(n, dtype=bool)
+    grau = graph.graus.astype(np.int64)
+    passos = []
+    adj = None
+    if n <= MAX_DOMINACAO:
+        adj = np.zeros((n, n), dtype=bool)
+        adj[graph.origem, graph.destino] = True
+        adj[graph.destino, graph.origem] = True
+
+    def remove(vertex, dominante):
+        vivo[vertex] = False
+        passos.append((vertex, dominante))
+        neighbors = graph[vertex]
+        neighbors = neighbors[vivo[neighbors]]
+        grau[neighbors] -= 1
+        if adj is not None:
+            adj[vertex, :] = False
+            adj[:, vertex] = False
+        return neighbors
+
+    mudou = True
+    while mudou:
+        mudou = False
+        # poda dos vértices com grau < k
+        pilha = np.flatnonzero(vivo & (grau < k)).tolist()
+        while pilha:
+            vertex = pilha.pop()
+            if not vivo[vertex]:
+                continue
+            neighbors = remove(vertex, -1)
+            pilha.extend(neighbors[grau[neighbors] == k - 1].tolist())
+            mudou = True
+
+        if adj is None:
+            break
+        # vértices dominados: os candidatos a dominar u são os vizinhos
+        # (não adjacentes a u) do vizinho de u de menor grau
+        for u in np.flatnonzero(vivo).tolist():
+            neighbors = graph[u]
+            neighbors = neighbors[vivo[neighbors]]
+            if len(neighbors) == 0:
+                continue
+            w = neighbors[np.argmin(grau[neighbors])]
+            candidatos = graph[w]
+            candidatos = candidatos[vivo[candidatos] & (candidatos != u) & ~adj[u, candidatos]]
+            if len(candidatos) == 0:
+                continue
+            dominantes = candidatos[adj[np.ix_(candidatos, neighbors)].all(axis=1)]
+            if len(dominantes):
+                remove(u, int(dominantes[0]))
+                mudou = True
+
+    nucleo = np.flatnonzero(vivo)
+    return Reducao(graph, k, passos, nucleo, componentes(graph, nucleo))
+
+# componentes conexas do subgrafo induzido por vertices, por propagação
+# do menor rótulo ao longo das arestas
+def componentes(graph, vertices):
+    if len(vertices) == 0:
+        return []
+    sub = graph.subgrafo(vertices)
+    rotulo = np.arange(len(vertices))
+    while True:
+        anterior = rotulo.copy()
+        np.minimum.at(rotulo, sub.origem, rotulo[sub.destino])
+        np.minimum.at(rotulo, sub.destino, rotulo[sub.origem])
+        rotulo = rotulo[rotulo]
+        if np.array_equal(rotulo, anterior):
+            break
+    return [vertices[rotulo == r] for r in np.unique(rotulo)]
@@ -0,0 +1,121 @@
+#!/bin/env python3
+
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import time
+import argparse
+
+#----------------------------------------------------
+#   resultados - registro das execuções em SQLite
+#----------------------------------------------------
+
+# Cada execução do solver vira uma linha da tabela execucoes; a tabela só
+# recebe inserções, de modo que vários processos (run-parallel.py) podem
+# gravar no mesmo arquivo. params guarda em JSON os demais parâmetros da
+# busca (level, workers, batch, time_limit, ...).
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id         INTEGER PRIMARY KEY,
+    quando     REAL NOT NULL,
+    instancia  TEXT NOT NULL,
+    k          INTEGER NOT NULL,
+    n          INTEGER NOT NULL,
+    m          INTEGER NOT NULL,
+    score      INTEGER NOT NULL,
+    valid      INTEGER NOT NULL,
+    expired    INTEGER NOT NULL,
+    seconds    REAL NOT NULL,
+    playouts   INTEGER NOT NULL,
+    seed       TEXT,
+    algorithm  TEXT NOT NULL,
+    params     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS execucoes_instancia ON execucoes (instancia, k);
+"""
+
+def conecta(caminho):
+    # timeout alto: os processos do pool disputam a escrita no mesmo arquivo
+    con = sqlite3.connect(caminho, timeout=60)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(ESQUEMA)
+    return con
+
+# grava uma execução (um solver.Resultado) no arquivo caminho
+# (a semente é a de resultado.seed, guardada como texto porque a entropia
+# de uma SeedSequence passa de 64 bits; o spawn_key de uma semente filha
+# vai para params)
+def registra(caminho, fname, graph, k, resultado, algorithm, **params):
+    if resultado.spawn_key:
+        params["spawn_key"] = list(resultado.spawn_key)
+    con = conecta(caminho)
+    try:
+        with con:
+            con.execute(
+                "INSERT INTO execucoes (quando, instancia, k, n, m, score, valid, expired,"
+                " seconds, playouts, seed, algorithm, params)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), os.path.basename(fname), k,
+                 graph.number_of_nodes(), graph.number_of_edges(),
+                 int(resultado.score), bool(resultado.valid), bool(resultado.time_expired),
+                 resultado.seconds, resultado.playouts,
+                 None if resultado.seed is None else str(resultado.seed), algorithm,
+                 json.dumps(params, sort_keys=True)))
+    finally:
+        con.close()
+
+# resumo por (algoritmo, instância, k): execuções, taxa de sucesso, tempo
+# médio e mediano até a solução (só das execuções que acharam uma
+# coloração válida) e playouts por segundo
+def resumo(caminho, algorithm=None):
+    con = conecta(caminho)
+    try:
+        sql = "SELECT algorithm, instancia, k, valid, seconds, playouts FROM execucoes"
+        args = ()
+        if algorithm is not None:
+            sql += " WHERE algorithm = ?"
+            args = (algorithm,)
+        linhas = con.execute(sql + " ORDER BY algorithm, instancia, k", args).fetchall()
+    finally:
+        con.close()
+
+    grupos = {}
+    for alg, instancia, k, valid, seconds, playouts in linhas:
+        grupos.setdefault((alg, instancia, k), []).append((valid, seconds, playouts))
+
+    tabela = []
+    for (alg, instancia, k), execucoes in grupos.items():
+        tempos = [seconds for valid, seconds, _ in execucoes if valid]
+        total_segundos = sum(seconds for _, seconds, _ in execucoes)
+        total_playouts = sum(playouts for _, _, playouts in execucoes)
+        tabela.append((alg, instancia, k, len(execucoes),
+                       len(tempos) / len(execucoes),
+                       statistics.mean(tempos) if tempos else None,
+                       statistics.median(tempos) if tempos else None,
+                       total_playouts / total_segundos if total_segundos else 0.0))
+    return tabela
+
+def imprime_resumo(tabela):
+    print(f'{"algoritmo":<11} {"instância":<25} {"k":<4} {"exec":>5} {"sucesso":>8} '
+          f'{"média(s)":>9} {"mediana(s)":>10} {"playouts/s":>11}')
+    for alg, instancia, k, execucoes, sucesso, media, mediana, taxa in tabela:
+        media = f'{media:>9.2f}' if media is not None else f'{"-":>9}'
+        mediana = f'{mediana:>10.2f}' if mediana is not None else f'{"-":>10}'
+        print(f'{alg:<11} {instancia:<25} {k:<4} {execucoes:>5} {sucesso:>8.0%} '
+              f'{media} {mediana} {taxa:>11.0f}')
+
+def main():
+    parser = argparse.ArgumentParser(description="resumo das execuções gravadas")
+    parser.add_argument("db", metavar="<arquivo de resultados>")
+    parser.add_argument("--algorithm", default=None, help="mostra apenas este algoritmo")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"File {args.db} not found.", file=sys.stderr)
+        exit(1)
+    imprime_resumo(resumo(args.db, args.algorithm))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1241 @@
+import bisect
+import functools
+import itertools
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+import numpy as np
+from checkpoint import salva as salva_checkpoint, carrega as carrega_checkpoint
+from playout_lote import playout_lote
+from busca_local import tabucol
+from reducao import reduz
+from clique import clique_gulosa
+
+#----------------------------------------------------
+#   solver - núcleo comum do NRPA e do NMCS
+#----------------------------------------------------
+
+# Os scripts nrpa_per_time.py, nrpa_jaime.py e nmcs.py são apenas linhas
+# de comando para solve(); todo o estado de uma busca fica em um objeto
+# Busca, de modo que várias instâncias podem ser resolvidas no mesmo
+# processo.
+
+ALPHA = 0.3
+N = 5           # Número de iterações de cada nível do NRPA
+LEVEL = 5       # Nível padrão do NRPA recursivo
+NMCS_LEVEL = 2  # Nível padrão do NMCS
+PLAYOUTS_POR_RODADA = 100  # playouts de cada processo por rodada (workers > 1)
+# até este número de cores o sorteio de cada passo é feito em Python: com
+# poucas cores o custo fixo de cada chamada do NumPy domina
+MAX_CORES_PYTHON = 40
+
+ALGORITHMS = ("nrpa", "nrpa-level", "nmcs")
+CHECKPOINT_EVERY = 60  # segundos entre checkpoints
+
+#----------------------------------------------------
+#   Deadline - prazo cooperativo
+#----------------------------------------------------
+
+# Prazo medido com o relógio monotônico e consultado pelas próprias
+# buscas (uma vez por playout), sem sinais: funciona em qualquer thread,
+# em pools de processos e em executores do asyncio, com prazos menores
+# que um segundo. expired() só lê o relógio a cada check_every chamadas.
+# cancel() encerra a busca a partir de outra thread.
+# Com pai, o prazo é uma parte do prazo pai: termina no que vier antes e
+# também quando o pai expira ou é cancelado.
+class Deadline:
+    def __init__(self, seconds=None, check_every=1, pai=None):
+        self.fim = time.monotonic() + seconds if seconds else float('inf')
+        self.check_every = check_every
+        self.calls = 0
+        self.expirado = False
+        self.pai = pai
+        if pai is not None:
+            self.fim = min(self.fim, pai.fim)
+
+    def expired(self) -> bool:
+        if self.expirado:
+            return True
+        if self.pai is not None and self.pai.expired():
+            self.expirado = True
+            return True
+        self.calls += 1
+        if self.calls >= self.check_every:
+            self.calls = 0
+            self.expirado = time.monotonic() >= self.fim
+        return self.expirado
+
+    def remaining(self) -> float:
+        return max(0.0, self.fim - time.monotonic())
+
+    def cancel(self):
+        self.expirado = True
+
+# fila de prioridade de vértices no estilo DSATUR: o próximo vértice é o
+# de maior grau de saturação (cores distintas entre os vizinhos já
+# coloridos) e, em caso de empate, o de maior grau. A fila é criada uma
+# vez por grafo, reiniciada a cada playout e atualizada por State.play.
+class FilaVertices:
+    def __init__(self, graph):
+        # prioridade = saturação * peso + grau, exata em ponto flutuante
+        self.peso = float(graph.graus.max(initial=0) + 1)
+        self.inicial = graph.graus.astype(np.float64)
+        self.fila = self.inicial.copy()
+    def reset(self):
+        np.copyto(self.fila, self.inicial)
+    def pop(self):
+        return int(self.fila.argmax())
+    def muda_prioridade(self, v, prioridade):
+        self.fila[v] = prioridade
+    # vertex foi colorido e os vértices em saturados ganharam uma cor
+    # nova na vizinhança; vértices já coloridos ficam em -inf
+    # (take/put no lugar de fila[saturados] += peso: com poucos vizinhos o
+    # custo é o da chamada, e take/put são as chamadas mais baratas)
+    def colore(self, vertex, saturados):
+        self.fila[vertex] = -np.inf
+        self.fila.put(saturados, self.fila.take(saturados) + self.peso)
+    # desfaz colore(): vertex volta à fila com a sua saturação atual
+    def descolore(self, vertex, saturacao, dessaturados):
+        self.fila[vertex] = saturacao * self.peso + self.inicial[vertex]
+        self.fila.put(dessaturados, self.fila.take(dessaturados) - self.peso)
+
+class State:
+    def __init__(self, graph, max_colors):
+        self.graph = graph
+        self.n = graph.number_of_nodes()
+        self.max_colors = max_colors
+        self.color = np.full(self.n, -1, dtype=np.int32) # -1: sem cor
+        self.colored = 0  # número de vértices coloridos
+        # mantidos a cada play(), para que o score não percorra as arestas
+        self.conflitos = 0  # arestas com as duas pontas da mesma cor
+        self.uso_cores = [0] * max_colors
+        self.cores_usadas = 0
+        # cont_cores[c][v]: quantos vizinhos de v já receberam a cor c
+        # (uma linha por cor, para que play() atualize os vizinhos com
+        # índices de uma única dimensão)
+        self.cont_cores = np.zeros((max_colors, self.n), dtype=np.int32)
+        # probabilidades[i]: distribuição de Gibbs usada no i-ésimo passo
+        # do último playout, reaproveitada por adapt()
+        self.probabilidades = np.zeros((self.n, max_colors))
+        self.fila = FilaVertices(graph)
+        self.fixos = None  # cópia do estado depois dos movimentos fixos
+
+    def __str__(self):
+        return str(str(self.color)+'\n'+ str(self.colored) + '/' + str(self.n)+'\n')
+
+    def is_terminal(self) -> bool:
+        return self.colored == self.n
+
+    def is_color_valid(self, vertex: int, color: int) -> bool:
+        return self.cont_cores[color, vertex] == 0
+
+    # máscara das cores que podem ser usadas no vértice: as válidas ou,
+    # se não houver nenhuma, todas
+    def legal_mask(self, vertex):
+        mask = self.cont_cores[:, vertex] == 0
+        if not any(mask.tolist()):  # mais barato que mask.any() para k pequeno
+            mask[:] = True
+        return mask
+
+    # Alterações nos movimentos:
+    # 1. os movimentos possíveis consideram um único vértice, como
+    # descrito no artigo
+    # 2. Devolve as cores válidas e se não houver nenhuma, devolve
+    # as cores inválidas (há vizinhos com a mesma cor)
+    def possible_moves(self, vertex):
+        return [(vertex, color) for color in np.flatnonzero(self.legal_mask(vertex)).tolist()]
+
+    def play(self, move: tuple[int, int]):
+        vertex, color = move
+        cont = self.cont_cores[color]
+        self.conflitos += int(cont[vertex])
+        neighbors = self.graph[vertex]
+        contagem = cont.take(neighbors) + 1
+        cont.put(neighbors, contagem)
+        self.fila.colore(vertex, neighbors[contagem == 1])
+        if self.uso_cores[color] == 0:
+            self.cores_usadas += 1
+        self.uso_cores[color] += 1
+        self.color[vertex] = color
+        self.colored += 1
+
+    # desfaz play(move), que deve ter sido o último movimento do vértice
+    def undo(self, move: tuple[int, int]):
+        vertex, color = move
+        cont = self.cont_cores[color]
+        neighbors = self.graph[vertex]
+        contagem = cont.take(neighbors) - 1
+        cont.put(neighbors, contagem)
+        self.conflitos -= int(cont[vertex])
+        self.fila.descolore(vertex, np.count_nonzero(self.cont_cores[:, vertex]),
+                            neighbors[contagem == 0])
+        self.uso_cores[color] -= 1
+        if self.uso_cores[color] == 0:
+            self.cores_usadas -= 1
+        self.color[vertex] = -1
+        self.colored -= 1
+
+    def score1(self) -> int:
+        return -self.conflitos
+
+    def score2(self) -> int:
+        return -self.conflitos - self.cores_usadas
+
+    def initial_state(self):
+        if self.fixos is not None:
+            color, cont_cores, uso_cores, fila, self.colored, self.conflitos, self.cores_usadas = self.fixos
+            np.copyto(self.color, color)
+            np.copyto(self.cont_cores, cont_cores)
+            self.uso_cores[:] = uso_cores
+            np.copyto(self.fila.fila, fila)
+            return
+        self.color.fill(-1)
+        self.colored = 0
+        self.conflitos = 0
+        self.uso_cores[:] = [0] * self.max_colors
+        self.cores_usadas = 0
+        self.cont_cores.fill(0)
+        self.fila.reset()
+
+    # faz os movimentos dados e os torna parte do estado inicial: a
+    # partir daí initial_state() volta ao estado com eles já jogados
+    def fixa(self, moves):
+        self.fixos = None
+        self.initial_state()
+        for move in moves:
+            self.play(move)
+        self.fixos = (self.color.copy(), self.cont_cores.copy(), list(self.uso_cores),
+                      self.fila.fila.copy(), self.colored, self.conflitos, self.cores_usadas)
+
+# distribuição de Gibbs sobre as cores legais de um vértice (softmax da
+# linha da política restrita à máscara; as cores ilegais têm probabilidade 0).
+# Também aceita várias linhas de uma vez (uma por passo).
+def gibbs(rows, masks):
+    w = np.exp(rows - np.max(rows, axis=-1, where=masks, initial=-np.inf, keepdims=True))
+    w[~masks] = 0.0
+    return w / w.sum(axis=-1, keepdims=True)
+
+# Sorteia a cor de um vértice pela distribuição de Gibbs, com um único
+# sorteio sobre a soma acumulada (cores ilegais nunca são escolhidas, pois
+# não aumentam a soma); devolve a cor e a distribuição usada
+def sorteia(row, mask, rng):
+    if len(mask) <= MAX_CORES_PYTHON:
+        return sorteia_python(row.tolist(), mask.tolist(), rng.random())
+    probabilities = gibbs(row, mask)
+    cumulative = np.cumsum(probabilities)
+    color = int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side='right'))
+    return min(color, len(mask) - 1), probabilities
+
+# o mesmo sorteio sobre listas, com u uniforme em [0, 1)
+def sorteia_python(pesos, legais, u):
+    maior = max([p for p, legal in zip(pesos, legais) if legal])
+    w = [math.exp(p - maior) if legal else 0.0 for p, legal in zip(pesos, legais)]
+    acumulado = list(itertools.accumulate(w))
+    total = acumulado[-1]
+    color = bisect.bisect_right(acumulado, u * total)
+    if color == len(w):  # u * total arredondado para total
+        color = max(c for c, legal in enumerate(legais) if legal)
+    return color, [x / total for x in w]
+
+# a política é uma matriz n x max_colors: policy[v][c] é o peso do
+# movimento (v, c); a sequência é um array com uma linha (vértice, cor)
+# por passo e masks[i] são as cores legais no estado do i-ésimo passo,
+# guardadas para que adapt() use os mesmos movimentos do playout.
+# Se o estado já tiver vértices coloridos, só os passos jogados a partir
+# dele são devolvidos.
+def playout(state: State, policy: np.ndarray, rng) -> tuple[int, np.ndarray, np.ndarray]:
+    k = state.max_colors
+    start = state.colored
+    sequence = np.empty((state.n, 2), dtype=np.int32)
+    masks = np.empty((state.n, k), dtype=bool)
+
+    while not state.is_terminal():
+        step = state.colored
+        vertex = state.fila.pop()
+        masks[step] = state.legal_mask(vertex)
+        # Seleciona um movimento com base na distribuição de Gibbs
+        color, state.probabilidades[step] = sorteia(policy[vertex], masks[step], rng)
+        chosen_move = (vertex, color)
+
+        # Executa o movimento escolhido e adiciona à sequência
+        state.play(chosen_move)
+        sequence[step] = chosen_move
+
+    return state.score1(), sequence[start:], masks[start:]
+
+# Atualiza a política no lugar, de uma vez para toda a sequência.
+# Cada vértice aparece uma única vez na sequência, então as linhas
+# atualizadas são distintas e as probabilidades calculadas antes da
+# atualização correspondem à política original, como no NRPA.
+# masks são as cores legais de cada passo registradas pelo playout;
+# probabilities, se fornecido, traz a distribuição de cada passo da
+# sequência calculada durante o playout com esta mesma política
+def adapt(policy: np.ndarray, sequence: np.ndarray, masks: np.ndarray,
+          probabilities=None) -> np.ndarray:
+    vertices = sequence[:, 0]
+    colors = sequence[:, 1]
+    if probabilities is None:
+        probabilities = gibbs(policy[vertices], masks)
+    else:
+        probabilities = probabilities[:len(sequence)]
+
+    policy[vertices] -= ALPHA * probabilities
+    policy[vertices, colors] += ALPHA
+    return policy
+
+#----------------------------------------------------
+#   Estatisticas - instrumentação opcional do caminho quente
+#----------------------------------------------------
+
+# Tempo e número de chamadas de cada parte do playout e de adapt(), mais
+# o total de playouts e de passos. Só existe com solve(stats=True): nesse
+# caso a Busca usa playout_medido() e adapt_medido() no lugar de
+# playout() e adapt(), que continuam sem nenhuma verificação extra.
+PARTES = ("fila", "escolha", "movimentos", "sorteio", "play", "score", "adapt", "reparo")
+
+class Estatisticas:
+    def __init__(self):
+        self.zera()
+
+    def zera(self):
+        self.tempos = dict.fromkeys(PARTES, 0.0)
+        self.chamadas = dict.fromkeys(PARTES, 0)
+        self.playouts = 0
+        self.passos = 0
+        self.tempo_playouts = 0.0
+
+    def mede(self, parte, inicio):
+        self.tempos[parte] += time.perf_counter() - inicio
+        self.chamadas[parte] += 1
+
+    # acumula as medidas de outro objeto (as dos processos do pool)
+    def soma(self, outra):
+        for parte in PARTES:
+            self.tempos[parte] += outra.tempos[parte]
+            self.chamadas[parte] += outra.chamadas[parte]
+        self.playouts += outra.playouts
+        self.passos += outra.passos
+        self.tempo_playouts += outra.tempo_playouts
+
+    # devolve uma cópia das medidas e zera este objeto
+    def retira(self):
+        copia = Estatisticas()
+        copia.soma(self)
+        self.zera()
+        return copia
+
+    def playouts_por_segundo(self):
+        return self.playouts / self.tempo_playouts if self.tempo_playouts else 0.0
+
+    def passos_por_playout(self):
+        return self.passos / self.playouts if self.playouts else 0.0
+
+    def __str__(self):
+        linhas = [f'{"parte":<11} {"chamadas":>10} {"total(s)":>9} {"µs/chamada":>11}']
+        for parte in PARTES:
+            chamadas = self.chamadas[parte]
+            media = 1e6 * self.tempos[parte] / chamadas if chamadas else 0.0
+            linhas.append(f'{parte:<11} {chamadas:>10} {self.tempos[parte]:>9.3f} {media:>11.1f}')
+        linhas.append(f'playouts: {self.playouts} ({self.playouts_por_segundo():.1f}/s), '
+                      f'passos por playout: {self.passos_por_playout():.1f}')
+        return '\n'.join(linhas)
+
+# playout() medindo cada parte: escolha do vértice (FilaVertices),
+# cores legais (o possible_moves do artigo), sorteio, State.play e score
+def playout_medido(state: State, policy: np.ndarray, rng, stats: Estatisticas):
+    relogio = time.perf_counter
+    inicio_playout = relogio()
+    k = state.max_colors
+    start = state.colored
+    sequence = np.empty((state.n, 2), dtype=np.int32)
+    masks = np.empty((state.n, k), dtype=bool)
+
+    while not state.is_terminal():
+        step = state.colored
+        inicio = relogio()
+        vertex = state.fila.pop()
+        stats.mede("escolha", inicio)
+
+        inicio = relogio()
+        masks[step] = state.legal_mask(vertex)
+        stats.mede("movimentos", inicio)
+
+        inicio = relogio()
+        color, state.probabilidades[step] = sorteia(policy[vertex], masks[step], rng)
+        chosen_move = (vertex, color)
+        stats.mede("sorteio", inicio)
+
+        inicio = relogio()
+        state.play(chosen_move)
+        stats.mede("play", inicio)
+        sequence[step] = chosen_move
+
+    inicio = relogio()
+    score = state.score1()
+    stats.mede("score", inicio)
+
+    stats.playouts += 1
+    stats.passos += state.n - start
+    stats.tempo_playouts += relogio() - inicio_playout
+    return score, sequence[start:], masks[start:]
+
+def adapt_medido(policy, sequence, masks, probabilities=None, *, stats: Estatisticas):
+    inicio = time.perf_counter()
+    policy = adapt(policy, sequence, masks, probabilities)
+    stats.mede("adapt", inicio)
+    return policy
+
+# teste se uma coloração é válida
+# usado para validação da coloração encontrada e depuração
+def valid_coloring(state):
+    return state.is_terminal() and state.conflitos == 0
+
+def valid_sequence(sequence, graph, max_colors):
+    state = State(graph, max_colors)
+    for move in sequence:
+        state.play(move)
+    return valid_coloring(state)
+
+#----------------------------------------------------
+#   Busca - estado de uma chamada de solve()
+#----------------------------------------------------
+
+# evento de melhora emitido por solve(): instante (time.time()), segundos
+# desde o início da busca, playouts feitos até então, o novo melhor score
+# e o número de cores usadas pela sequência correspondente
+@dataclass
+class Evento:
+    timestamp: float
+    seconds: float
+    playouts: int
+    score: int
+    colors: int
+
+class Busca:
+    def __init__(self, graph, max_colors, batch=1, seed=None, deadline=None,
+                 callback=None, target_score=None, stats=False, reparo=0, clique=None):
+        self.graph = graph
+        self.max_colors = max_colors
+        self.batch = batch  # playouts avançados juntos no nível 0
+        self.reparo = reparo  # iterações da busca tabu (0: sem reparo)
+        self.melhor_playout = float('-inf')  # melhor score antes do reparo
+        # a semente da busca: o gerador principal sai dela e os geradores
+        # dos processos do pool saem de filhos gerados por spawn()
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.semente = seed
+        self.rng = np.random.default_rng(seed)
+        self.state = State(graph, max_colors)
+        # vértices de uma clique recebem as cores 0, 1, ... antes de toda
+        # busca (quebra de simetria); ficam fora dos playouts e de adapt()
+        self.clique = clique
+        self.fixos = np.empty((0, 2), dtype=np.int32)
+        if clique is not None and len(clique):
+            self.fixos = np.column_stack((clique, np.arange(len(clique)))).astype(np.int32)
+            self.state.fixa(self.fixos.tolist())
+        self.counter = 0    # número de chamadas de nrpa/nmcs
+        # playout() e adapt() usados pela busca: as versões medidas quando
+        # a instrumentação está ligada (Estatisticas)
+        self.stats = None
+        self.playout = playout
+        self.adapt = adapt
+        if stats:
+            self.stats = Estatisticas()
+            self.playout = functools.partial(playout_medido, stats=self.stats)
+            self.adapt = functools.partial(adapt_medido, stats=self.stats)
+            # a fila é criada uma única vez por busca; é refeita aqui só
+            # para medir o tempo de construção
+            inicio = time.perf_counter()
+            self.state.fila = FilaVertices(graph)
+            self.stats.mede("fila", inicio)
+        self.deadline = deadline if deadline is not None else Deadline()
+        # acompanhamento da busca: melhor score de todos os níveis,
+        # playouts feitos e eventos de melhora
+        self.playouts = 0
+        self.best_score = float('-inf')
+        self.callback = callback
+        self.target_score = target_score
+        self.alvo_atingido = False
+        self.inicio = time.monotonic()
+        self.decorrido_anterior = 0.0  # tempo já gasto antes de um resume
+        # checkpoints: arquivo, intervalo e o estado dos níveis do NRPA
+        # recursivo; retomada guarda os níveis lidos de um checkpoint
+        self.algorithm = None
+        self.level = None
+        self.checkpoint = None
+        self.checkpoint_every = CHECKPOINT_EVERY
+        self.ultimo_checkpoint = time.monotonic()
+        self.niveis = {}
+        self.proprias = {}
+        self.retomada = {}
+
+    def decorrido(self):
+        return self.decorrido_anterior + time.monotonic() - self.inicio
+
+    # chamado a cada playout; em uma melhora emite um Evento para o
+    # callback e encerra a busca se o callback devolver True ou se o
+    # score alvo tiver sido atingido
+    def registra(self, score, colors, playouts=1):
+        self.playouts += playouts
+        if score <= self.best_score:
+            return
+        self.best_score = score
+        parar = False
+        if self.callback is not None:
+            evento = Evento(time.time(), self.decorrido(), self.playouts, score, colors)
+            parar = bool(self.callback(evento))
+        if parar or (self.target_score is not None and score >= self.target_score):
+            self.alvo_atingido = True
+            self.deadline.cancel()
+
+    # primitiva de nível 0: um playout, ou o melhor de um lote de playouts
+    # avançados juntos; devolve também as probabilidades de cada passo
+    # quando elas podem ser reaproveitadas por adapt()
+    # Com reparo ligado, um playout que melhora o melhor score de playout
+    # (antes do reparo) sem ser válido passa pela busca tabu e o resultado
+    # reparado é devolvido no seu lugar (e é ele que adapt() usa)
+    def nivel0(self, policy):
+        if self.batch > 1:
+            inicio = time.perf_counter()
+            score, sequence, masks = playout_lote(policy, self.graph, self.batch, self.rng,
+                                                  fixos=self.fixos)
+            if self.stats is not None:
+                self.stats.playouts += self.batch
+                self.stats.passos += self.batch * len(sequence)
+                self.stats.tempo_playouts += time.perf_counter() - inicio
+            if self.reparo and self.melhor_playout < score < 0:
+                self.melhor_playout = score
+                score, sequence, masks = self.repara(sequence)
+            if score > self.best_score:
+                self.registra(score, self.cores_usadas(sequence), self.batch)
+            else:
+                self.playouts += self.batch
+            return score, sequence, masks, None
+        state = self.state
+        state.initial_state()
+        score, sequence, masks = self.playout(state, policy, self.rng)
+        if self.reparo and self.melhor_playout < score < 0:
+            self.melhor_playout = score
+            score, sequence, masks = self.repara(sequence)
+            self.registra(score, state.cores_usadas)
+            return score, sequence, masks, None
+        self.registra(score, state.cores_usadas)
+        # os passos dos vértices fixos (clique) não fazem parte da sequência
+        return score, sequence, masks, state.probabilidades[len(self.fixos):]
+
+    # busca tabu sobre a coloração de sequence; a sequência reparada
+    # mantém a ordem dos vértices do playout e as máscaras são as cores
+    # legais ao rejogá-la (deixa self.state no fim da sequência reparada)
+    def repara(self, sequence):
+        inicio = time.perf_counter()
+        cores = np.empty(self.graph.number_of_nodes(), dtype=np.int32)
+        cores[self.fixos[:, 0]] = self.fixos[:, 1]
+        cores[sequence[:, 0]] = sequence[:, 1]
+        conflitos, cores = tabucol(self.graph, self.max_colors, cores, self.reparo,
+                                   self.rng, self.deadline, self.fixos[:, 0])
+        sequence = np.column_stack((sequence[:, 0], cores[sequence[:, 0]])).astype(np.int32)
+        masks = self.rejoga(sequence)
+        if self.stats is not None:
+            self.stats.mede("reparo", inicio)
+        return -conflitos, sequence, masks
+
+    # número de cores usadas pelos movimentos fixos mais os de sequence
+    def cores_usadas(self, sequence):
+        return len(np.union1d(self.fixos[:, 1], sequence[:, 1]))
+
+    # joga sequence a partir do estado inicial e devolve as cores legais
+    # de cada passo, como as registradas por playout()
+    def rejoga(self, sequence):
+        state = self.state
+        state.initial_state()
+        masks = np.empty((len(sequence), self.max_colors), dtype=bool)
+        for step, move in enumerate(sequence.tolist()):
+            masks[step] = state.legal_mask(move[0])
+            state.play(move)
+        return masks
+
+    # (best_score, best_sequence, best_masks) iniciais do NRPA a partir de
+    # uma coloração dada (reparada antes, se houver reparo), sem os
+    # movimentos fixos (ver alinha_clique())
+    def inicial(self, sequence):
+        if self.reparo:
+            score, sequence, masks = self.repara(sequence)
+        else:
+            masks = self.rejoga(sequence)
+            score = self.state.score1()
+        self.registra(score, self.cores_usadas(sequence), playouts=0)
+        return score, sequence, masks
+
+    # grava um checkpoint se já se passaram checkpoint_every segundos
+    # desde o último; arrays e meta descrevem o estado da estratégia
+    # (arrays None são omitidos)
+    def hora_de_salvar(self):
+        return (self.checkpoint is not None and
+                time.monotonic() - self.ultimo_checkpoint >= self.checkpoint_every)
+
+    def talvez_salve(self, arrays, **meta):
+        if not self.hora_de_salvar():
+            return
+        meta.update(algorithm=self.algorithm, level=self.level, n=self.graph.number_of_nodes(),
+                    k=self.max_colors, counter=self.counter, playouts=self.playouts,
+                    best_score=self.best_score, elapsed=self.decorrido(),
+                    rng=self.rng.bit_generator.state, seed=self.semente.entropy,
+                    spawn_key=list(self.semente.spawn_key),
+                    spawned=self.semente.n_children_spawned, clique=self.clique is not None)
+        salva_checkpoint(self.checkpoint, meta,
+                         {nome: a for nome, a in arrays.items() if a is not None})
+        self.ultimo_checkpoint = time.monotonic()
+
+    # restaura os contadores e o gerador aleatório de um checkpoint
+    def retoma(self, meta):
+        self.counter = meta["counter"]
+        self.playouts = meta["playouts"]
+        self.best_score = meta["best_score"]
+        self.decorrido_anterior = meta["elapsed"]
+        self.rng.bit_generator.state = meta["rng"]
+        if "seed" in meta:
+            self.semente = np.random.SeedSequence(meta["seed"],
+                                                  spawn_key=tuple(meta.get("spawn_key", ())),
+                                                  n_children_spawned=meta["spawned"])
+
+#----------------------------------------------------
+#   Estratégias de busca
+#----------------------------------------------------
+
+# NRPA limitado por tempo: um único nível que adapta a política a cada
+# melhora, até encontrar uma coloração válida ou o tempo acabar.
+# playouts limita o número de playouts (usado pelos processos do pool);
+# inicial traz (best_score, best_sequence, best_masks) de um checkpoint.
+def nrpa_tempo(busca: Busca, policy, playouts=None, inicial=None):
+    busca.counter += 1
+
+    if inicial is None:
+        best_score = float('-inf')
+        best_sequence = best_masks = None
+    else:
+        best_score, best_sequence, best_masks = inicial
+        if best_score == 0:
+            return best_score, best_sequence, best_masks
+
+    i = 0
+    while True:
+        score, new_sequence, masks, probabilities = busca.nivel0(policy)
+        i += 1
+
+        if score > best_score:
+            best_score = score
+            best_sequence = new_sequence
+            best_masks = masks
+            if score == 0: # encontrou uma coloração valida
+                break
+            # a melhor sequência acabou de ser gerada com esta política
+            policy = busca.adapt(policy, best_sequence, masks, probabilities)
+        if i == playouts or busca.deadline.expired():
+            break
+        busca.talvez_salve({"policy": policy, "best_sequence": best_sequence,
+                            "best_masks": best_masks}, level_best_score=best_score)
+    return best_score, best_sequence, best_masks
+
+# NRPA recursivo: policies[level] é o buffer da política deste nível,
+# alocado uma única vez. A cópia da política do pai é feita só quando
+# necessária (copy-on-write): o nível recebe a política do pai em
+# herdada e a lê diretamente até o seu primeiro adapt(), quando ela é
+# copiada para o seu buffer. O pai não muda a sua política enquanto o
+# filho executa, e o nível 0 (que só lê a política) nunca copia nada.
+# busca.niveis[level] guarda (iteração, melhor score, sequência, máscaras)
+# de cada nível para os checkpoints, gravados no nível 1 depois de cada
+# adapt(); busca.proprias[level] diz se o nível já tem a sua cópia.
+# Ao retomar, os níveis acima de 1 continuam a iteração que estava em
+# andamento (com o filho partindo do seu próprio buffer) e o nível 1
+# continua da próxima iteração.
+def nrpa_nivel(busca: Busca, level, policies, herdada=None):
+    busca.counter += 1
+    propria = herdada is None
+    policy = policies[level] if propria else herdada
+    busca.proprias[level] = propria
+
+    if level == 0:
+        score, sequence, masks, _ = busca.nivel0(policy)
+        return score, sequence, masks
+
+    retomado = busca.retomada.pop(level, None)
+    if retomado is None:
+        inicio = 0
+        best_score = float('-inf')
+        best_sequence = []
+        best_masks = None
+        em_andamento = False
+    else:
+        inicio, best_score, best_sequence, best_masks = retomado
+        em_andamento = level > 1
+
+    for i in range(inicio, N):
+        busca.niveis[level] = (i, best_score, best_sequence, best_masks)
+        score, new_sequence, new_masks = nrpa_nivel(busca, level - 1, policies,
+                                                    None if em_andamento else policy)
+        em_andamento = False
+        if score > best_score:
+            best_score = score
+            best_sequence = new_sequence
+            best_masks = new_masks
+            if score == 0:
+                # encontrou uma coloração valida
+                break
+        if busca.deadline.expired():
+            break
+        # Adapta a política com base na melhor sequência encontrada
+        if not propria:
+            np.copyto(policies[level], policy)
+            policy = policies[level]
+            propria = busca.proprias[level] = True
+        policy = busca.adapt(policy, best_sequence, best_masks)
+        if level == 1:
+            busca.niveis[1] = (i + 1, best_score, best_sequence, best_masks)
+            salva_niveis(busca, policies)
+
+    return best_score, best_sequence, best_masks
+
+# os níveis que ainda leem a política do pai são gravados com ela, para
+# que ao retomar cada nível encontre a sua política no próprio buffer
+def salva_niveis(busca: Busca, policies):
+    if not busca.hora_de_salvar():
+        return
+    if not all(busca.proprias.values()):
+        policies = policies.copy()
+        for level in range(len(policies) - 2, -1, -1):
+            if not busca.proprias.get(level, True):
+                policies[level] = policies[level + 1]
+    arrays = {"policies": policies}
+    niveis = {}
+    for level, (i, best_score, best_sequence, best_masks) in busca.niveis.items():
+        niveis[level] = [i, best_score]
+        if best_masks is not None:
+            arrays[f"best_sequence_{level}"] = best_sequence
+            arrays[f"best_masks_{level}"] = best_masks
+    busca.talvez_salve(arrays, niveis=niveis)
+
+def carrega_niveis(meta, arrays):
+    retomada = {}
+    for level, (i, best_score) in meta["niveis"].items():
+        level = int(level)
+        retomada[level] = (i, best_score,
+                           arrays.get(f"best_sequence_{level}", []),
+                           arrays.get(f"best_masks_{level}"))
+    return retomada
+
+# NMCS - Nested Monte Carlo Search
+# Usa o mesmo State e a mesma ordem de vértices (FilaVertices) do NRPA.
+# O nível 0 é um playout uniforme (política nula) a partir do estado
+# atual. Em cada nível, todos os movimentos do vértice corrente são
+# avaliados por uma busca de nível inferior, a melhor sequência
+# encontrada até então é memorizada e o seu próximo movimento é jogado.
+# O estado é sempre devolvido como foi recebido; a sequência devolvida
+# contém apenas os movimentos a partir dele.
+def nmcs(busca: Busca, level, policy):
+    busca.counter += 1
+    state = busca.state
+
+    if level == 0:
+        score, sequence, masks = busca.playout(state, policy, busca.rng)
+        busca.registra(score, state.cores_usadas)
+        for move in sequence[::-1].tolist():
+            state.undo(move)
+        return score, sequence.tolist()
+
+    # coloração já completa: não há movimentos, mas o score é o do estado
+    # (senão o pai não teria melhor sequência para seguir)
+    if state.is_terminal():
+        return state.score1(), []
+
+    best_score = float('-inf')
+    best_sequence = []
+    played = []
+
+    while not state.is_terminal():
+        vertex = state.fila.pop()
+        for move in state.possible_moves(vertex):
+            state.play(move)
+            score, sequence = nmcs(busca, level - 1, policy)
+            state.undo(move)
+            if score > best_score:
+                best_score = score
+                best_sequence = played + [move] + sequence
+            if best_score == 0 or busca.deadline.expired():
+                break
+        if best_score == 0 or busca.deadline.expired():
+            break
+        # memorização: segue a melhor sequência encontrada até agora
+        move = tuple(best_sequence[len(played)])
+        state.play(move)
+        played.append(move)
+
+    for move in reversed(played):
+        state.undo(move)
+    return best_score, best_sequence
+
+#----------------------------------------------------
+#   NRPA com vários processos
+#----------------------------------------------------
+
+# Cada processo do pool monta a sua própria Busca sobre o grafo recebido
+# na inicialização; com fork (ou com o cache de read_dimacs) os arrays do
+# grafo são compartilhados entre os processos.
+worker_busca = None
+
+def inicia_worker(graph, max_colors, batch, stats, reparo, clique):
+    global worker_busca
+    worker_busca = Busca(graph, max_colors, batch, stats=stats, reparo=reparo, clique=clique)
+
+# uma rodada de um processo: nrpa_tempo() a partir de uma cópia da
+# política global, limitado a playouts playouts ou até o prazo global
+# (devolve também o número de playouts feitos na rodada e as medidas da
+# rodada, se a instrumentação estiver ligada). O gerador vem
+# com a tarefa, e não do processo, para que a i-ésima tarefa de cada
+# rodada use sempre o mesmo fluxo, qualquer que seja o processo que a pegue.
+def rodada(policy, playouts, deadline, semente):
+    worker_busca.deadline = deadline
+    worker_busca.rng = np.random.default_rng(semente)
+    antes = worker_busca.playouts
+    resultado = nrpa_tempo(worker_busca, policy, playouts)
+    stats = worker_busca.stats.retira() if worker_busca.stats is not None else None
+    return resultado + (worker_busca.playouts - antes, stats)
+
+# A cada rodada os processos exploram subárvores independentes a partir
+# da política global; a melhor sequência encontrada até então é usada
+# para adaptar a política global antes da rodada seguinte, como um nível
+# a mais do NRPA.
+def nrpa_paralelo(busca: Busca, policy, workers, inicial=None):
+    if inicial is None:
+        best_score = float('-inf')
+        best_sequence = best_masks = None
+    else:
+        best_score, best_sequence, best_masks = inicial
+        if best_score == 0:
+            return best_score, best_sequence, best_masks
+
+    with multiprocessing.Pool(workers, initializer=inicia_worker,
+                              initargs=(busca.graph, busca.max_colors, busca.batch,
+                                        busca.stats is not None, busca.reparo,
+                                        busca.clique)) as pool:
+        while True:
+            busca.counter += 1
+            resultados = pool.starmap(rodada, [(policy, PLAYOUTS_POR_RODADA, busca.deadline, semente)
+                                               for semente in busca.semente.spawn(workers)])
+            for score, new_sequence, masks, playouts, stats in resultados:
+                if stats is not None:
+                    busca.stats.soma(stats)
+                if score > best_score:
+                    best_score = score
+                    best_sequence = new_sequence
+                    best_masks = masks
+                    busca.registra(score, busca.cores_usadas(new_sequence), playouts)
+                else:
+                    busca.playouts += playouts
+            if best_score == 0 or busca.deadline.expired():
+                break
+            policy = busca.adapt(policy, best_sequence, best_masks)
+            busca.talvez_salve({"policy": policy, "best_sequence": best_sequence,
+                                "best_masks": best_masks}, level_best_score=best_score)
+
+    return best_score, best_sequence, best_masks
+
+#----------------------------------------------------
+#   solve() - ponto de entrada
+#----------------------------------------------------
+
+@dataclass
+class Resultado:
+    score: int
+    sequence: np.ndarray     # uma linha (vértice, cor) por vértice
+    valid: bool
+    time_expired: bool
+    seconds: float
+    counter: int             # número de chamadas de nrpa/nmcs
+    playouts: int = 0
+    seed: int = None         # semente usada (repete a busca com solve(seed=...))
+    stats: Estatisticas = None  # medidas do caminho quente (solve(stats=True))
+    policy: np.ndarray = None   # política final do NRPA (n x k)
+    reducao: float = None       # fração dos vértices no núcleo (solve(reduce=True))
+    lower_bound: int = None     # tamanho da clique (solve(clique=True))
+    # spawn_key da semente, quando ela é filha de outra (etapas de desce(),
+    # componentes de solve(reduce=True)): a busca se repete com
+    # solve(seed=np.random.SeedSequence(seed, spawn_key=spawn_key))
+    spawn_key: tuple = ()
+
+# Resolve a k-coloração de graph (um read_dimacs.Grafo) com o algoritmo
+# escolhido: "nrpa" (limitado por tempo, opcionalmente com workers
+# processos), "nrpa-level" (NRPA recursivo de nível level) ou "nmcs".
+# time_limit é dado em segundos (aceita frações); None ou 0 significa sem
+# limite. Em vez de time_limit pode ser passado um Deadline já criado,
+# por exemplo para compartilhar o prazo ou cancelar a busca de fora.
+# callback(evento) é chamado a cada melhora do melhor score (ver Evento)
+# e pode devolver True para encerrar a busca; a busca também termina
+# quando o melhor score chega a target_score.
+# Com checkpoint (um caminho de arquivo), o estado da busca NRPA é gravado
+# a cada checkpoint_every segundos; se o arquivo já existir, a busca é
+# retomada dele com o que resta de time_limit.
+# seed (um inteiro ou uma np.random.SeedSequence) fixa os geradores
+# aleatórios; sem seed é usada uma semente nova, devolvida em
+# Resultado.seed (e Resultado.spawn_key). Com workers > 1 a busca só se repete exatamente se o
+# número de rodadas também se repetir (por exemplo, com target_score).
+# stats=True liga a instrumentação do playout e de adapt (ver
+# Estatisticas), devolvida em Resultado.stats.
+# repair > 0 repara com até repair iterações de busca tabu cada playout
+# que melhora o melhor score sem ser uma coloração válida (ver
+# Busca.nivel0); não se aplica ao NMCS.
+# policy (n x k) é a política inicial do NRPA, no lugar da política nula
+# (é alterada no lugar e devolvida em Resultado.policy); initial_sequence
+# é uma coloração completa usada como melhor sequência inicial do "nrpa"
+# (no "nrpa-level" ela serve apenas para alinhar as colunas da política
+# às cores fixas da clique).
+# Ambos servem para continuar uma busca anterior (ver desce()).
+# clique=True fixa as cores 0, 1, ... nos vértices de uma clique
+# encontrada de forma gulosa (quebra a simetria entre as permutações das
+# cores) e devolve o tamanho dela em Resultado.lower_bound; com k menor
+# que esse limite a busca termina de imediato, sem solução.
+# reduce=True reduz o grafo antes da busca (ver reducao.py): cada
+# componente do núcleo é resolvida com os demais argumentos, dividindo o
+# mesmo prazo, e a coloração é estendida ao grafo inteiro.
+def solve(graph, k, algorithm="nrpa", time_limit=None, seed=None,
+          level=None, workers=1, batch=1, deadline=None,
+          callback=None, target_score=None,
+          checkpoint=None, checkpoint_every=CHECKPOINT_EVERY, stats=False,
+          repair=0, policy=None, initial_sequence=None, reduce=False,
+          clique=False) -> Resultado:
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm {algorithm!r}; expected one of {ALGORITHMS}")
+    if reduce:
+        if (checkpoint is not None or target_score is not None or policy is not None
+                or initial_sequence is not None):
+            raise ValueError("reduce cannot be combined with checkpoint, target_score, "
+                             "policy or initial_sequence")
+        return solve_reduzido(graph, k, algorithm, time_limit, seed, deadline,
+                              level=level, workers=workers, batch=batch, callback=callback,
+                              stats=stats, repair=repair, clique=clique)
+    if checkpoint is not None and algorithm == "nmcs":
+        raise ValueError("checkpoints are only supported for the NRPA algorithms")
+    n = graph.number_of_nodes()
+    if algorithm == "nrpa-level":
+        level = LEVEL if level is None else level
+    elif algorithm == "nmcs":
+        level = NMCS_LEVEL if level is None else level
+
+    meta = arrays = None
+    if checkpoint is not None and os.path.exists(checkpoint):
+        meta, arrays = carrega_checkpoint(checkpoint)
+        if ((meta["algorithm"], meta["n"], meta["k"], meta.get("level"), meta.get("clique", False))
+                != (algorithm, n, k, level, clique)):
+            raise ValueError(f"checkpoint {checkpoint} was written by a different search")
+        if time_limit:
+            # o prazo do resume é o que restava do orçamento original
+            time_limit = max(time_limit - meta["elapsed"], 1e-9)
+
+    vertices_clique = None
+    if clique:
+        start_time = time.monotonic()
+        vertices_clique = clique_gulosa(graph)
+        if k < len(vertices_clique):
+            return sem_solucao(graph, k, seed, len(vertices_clique), start_time)
+
+    if deadline is None:
+        deadline = Deadline(time_limit)
+    busca = Busca(graph, k, batch, seed, deadline, callback, target_score, stats, repair,
+                  vertices_clique)
+    busca.algorithm = algorithm
+    busca.level = level
+    busca.checkpoint = checkpoint
+    busca.checkpoint_every = checkpoint_every
+    if meta is not None:
+        busca.retoma(meta)
+
+    start_time = time.monotonic()
+    if algorithm == "nrpa":
+        if meta is None:
+            if policy is None:
+                policy = np.zeros((n, k))
+            inicial = None
+            if initial_sequence is not None:
+                initial_sequence, policy = alinha_clique(initial_sequence, policy, busca.fixos)
+                inicial = busca.inicial(initial_sequence)
+        else:
+            policy = arrays["policy"]
+            inicial = (meta["level_best_score"], arrays.get("best_sequence"),
+                       arrays.get("best_masks"))
+        if workers > 1:
+            score, sequence, _ = nrpa_paralelo(busca, policy, workers, inicial)
+        else:
+            score, sequence, _ = nrpa_tempo(busca, policy, inicial=inicial)
+    elif algorithm == "nrpa-level":
+        if meta is None:
+            # uma política por nível, alocadas uma única vez
+            policies = np.zeros((level + 1, n, k))
+            if policy is not None:
+                if initial_sequence is not None:
+                    _, policy = alinha_clique(initial_sequence, policy, busca.fixos)
+                policies[level] = policy
+        else:
+            policies = arrays["policies"]
+            busca.retomada = carrega_niveis(meta, arrays)
+        score, sequence, _ = nrpa_nivel(busca, level, policies)
+        policy = policies[level]
+    else:
+        busca.state.initial_state()
+        score, sequence = nmcs(busca, level, np.zeros((graph.number_of_nodes(), k)))
+        sequence = np.array(sequence, dtype=np.int32).reshape(-1, 2)
+        policy = None
+    seconds = busca.decorrido_anterior + time.monotonic() - start_time
+    sequence = np.concatenate((busca.fixos, sequence)).astype(np.int32)
+
+    time_expired = (score != 0 and not busca.alvo_atingido and
+                    (deadline.expirado or deadline.remaining() == 0))
+    return Resultado(score, sequence, valid_sequence(sequence, graph, k),
+                     time_expired, seconds, busca.counter, busca.playouts,
+                     busca.semente.entropy, busca.stats, policy,
+                     lower_bound=len(vertices_clique) if clique else None,
+                     spawn_key=busca.semente.spawn_key)
+
+# k menor que o limite inferior: nenhuma k-coloração existe, então a
+# busca não é feita; a coloração devolvida é a de um único playout
+def sem_solucao(graph, k, seed, lower_bound, start_time):
+    semente = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    state = State(graph, k)
+    state.initial_state()
+    score, sequence, _ = playout(state, np.zeros((graph.number_of_nodes(), k)),
+                                 np.random.default_rng(semente))
+    return Resultado(score, sequence, False, False, time.monotonic() - start_time, 0, 1,
+                     semente.entropy, lower_bound=lower_bound, spawn_key=semente.spawn_key)
+
+# Renomeia as cores de uma coloração completa (e as colunas da política,
+# se houver) para que os vértices fixos tenham as suas cores; vértices
+# fixos que dividiam uma cor simplesmente recebem a sua. Devolve a
+# sequência sem os movimentos fixos e a política renomeada.
+def alinha_clique(sequence, policy, fixos):
+    if len(fixos) == 0:
+        return sequence, policy
+    k = int(max(sequence[:, 1].max(), fixos[:, 1].max())) + 1
+    if policy is not None:
+        k = policy.shape[1]
+    nova = np.full(k, -1, dtype=np.int64)
+    cores = np.empty(len(sequence), dtype=np.int64)
+    cores[sequence[:, 0]] = sequence[:, 1]
+    for vertex, color in fixos.tolist():
+        if nova[cores[vertex]] < 0 and color not in nova:
+            nova[cores[vertex]] = color
+    livres = np.setdiff1d(np.arange(k), nova)
+    nova[nova < 0] = livres[:np.count_nonzero(nova < 0)]
+    fixo = np.zeros(len(cores), dtype=bool)
+    fixo[fixos[:, 0]] = True
+    sequence = sequence[~fixo[sequence[:, 0]]]
+    sequence = np.column_stack((sequence[:, 0], nova[sequence[:, 1]])).astype(np.int32)
+    if policy is not None:
+        policy = policy[:, np.argsort(nova)]
+    return sequence, policy
+
+# solve(reduce=True): resolve as componentes do núcleo do grafo reduzido
+# uma após a outra e levanta a coloração para o grafo original. O score
+# é o do grafo original (o levantamento não cria conflitos, mas repete
+# os conflitos que sobrarem no núcleo nos vértices dominados).
+# As componentes são resolvidas da menor para a maior, cada uma com uma
+# parte do tempo restante proporcional ao seu tamanho (o que uma
+# componente não usa fica para as seguintes). Os Eventos do callback
+# trazem o score e os playouts somados das componentes já resolvidas e
+# da atual; as componentes ainda não iniciadas não entram na soma.
+def solve_reduzido(graph, k, algorithm, time_limit, seed, deadline, callback=None, **kwargs):
+    inicio = time.monotonic()
+    if deadline is None:
+        deadline = Deadline(time_limit)
+    semente = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    reducao = reduz(graph, k)
+    componentes = sorted(reducao.componentes, key=len)
+
+    cores = np.full(graph.number_of_nodes(), -1, dtype=np.int32)
+    ordem = []
+    etapas = []
+
+    def repassa(evento):
+        evento = Evento(evento.timestamp, time.monotonic() - inicio,
+                        sum(r.playouts for r in etapas) + evento.playouts,
+                        sum(int(r.score) for r in etapas) + evento.score,
+                        max([len(np.unique(cores[cores >= 0]))] + [evento.colors]))
+        if callback(evento):
+            deadline.cancel()
+            return True
+        return False
+
+    faltam = sum(len(vertices) for vertices in componentes)
+    for vertices, filho in zip(componentes, semente.spawn(len(componentes))):
+        parte = Deadline(max(deadline.remaining() * len(vertices) / faltam, 1e-9), pai=deadline)
+        faltam -= len(vertices)
+        resultado = solve(graph.subgrafo(vertices), k, algorithm, deadline=parte, seed=filho,
+                          callback=repassa if callback is not None else None, **kwargs)
+        etapas.append(resultado)
+        ordem.extend(vertices[resultado.sequence[:, 0]].tolist())
+        cores[vertices[resultado.sequence[:, 0]]] = resultado.sequence[:, 1]
+    # vértices do núcleo que uma busca interrompida não chegou a colorir
+    faltando = reducao.nucleo[cores[reducao.nucleo] < 0]
+    cores[faltando] = 0
+    ordem.extend(faltando.tolist())
+
+    cores, levantados = reducao.levanta(cores)
+    ordem = np.array(ordem + levantados, dtype=np.int32)
+    sequence = np.column_stack((ordem, cores[ordem])).astype(np.int32)
+    score = -int(np.count_nonzero(cores[graph.origem] == cores[graph.destino]))
+
+    stats = None
+    if kwargs.get("stats"):
+        stats = Estatisticas()
+        for resultado in etapas:
+            stats.soma(resultado.stats)
+    return Resultado(score, sequence, valid_sequence(sequence, graph, k),
+                     any(r.time_expired for r in etapas),
+                     time.monotonic() - inicio,
+                     sum(r.counter for r in etapas), sum(r.playouts for r in etapas),
+                     semente.entropy, stats, None, reducao.razao(),
+                     max((r.lower_bound for r in etapas if r.lower_bound is not None),
+                         default=None),
+                     semente.spawn_key)
+
+# Tira uma cor de uma k-coloração para começar a busca com k-1 cores:
+# a cor menos usada é removida, cada vértice que a tinha recebe (na ordem
+# da sequência) a cor restante com menos vizinhos daquela cor e as cores
+# acima dela descem uma posição. A coluna da cor removida sai da
+# política, de modo que o que foi aprendido para as demais é mantido.
+def remove_cor(graph, sequence, policy):
+    k = policy.shape[1]
+    cores = np.empty(graph.number_of_nodes(), dtype=np.int32)
+    cores[sequence[:, 0]] = sequence[:, 1]
+    removida = int(np.argmin(np.bincount(cores, minlength=k)))
+    for vertex in sequence[cores[sequence[:, 0]] == removida, 0].tolist():
+        contagem = np.bincount(cores[graph[vertex]], minlength=k)
+        contagem[removida] = np.iinfo(contagem.dtype).max
+        cores[vertex] = int(np.argmin(contagem))
+    cores[cores > removida] -= 1
+    sequence = np.column_stack((sequence[:, 0], cores[sequence[:, 0]])).astype(np.int32)
+    return np.delete(policy, removida, axis=1), sequence
+
+# Descida do número de cores: resolve com k cores e, a cada coloração
+# válida, continua com k-1 a partir da melhor coloração e da política
+# aprendida (remove_cor), em vez de recomeçar do zero, até que o prazo
+# acabe ou k chegue a 1. Os argumentos são os de solve() (algorithm
+# "nrpa" ou "nrpa-level"); time_limit é o orçamento da descida inteira.
+# Devolve a lista de (k, Resultado) de cada etapa; a última etapa válida
+# é o menor k alcançado. A semente da etapa i é o filho i de seed
+# (Resultado.spawn_key); como cada etapa parte da anterior, ela se repete
+# refazendo a descida com a mesma seed.
+def desce(graph, k, algorithm="nrpa", time_limit=None, seed=None, deadline=None, **kwargs):
+    if algorithm == "nmcs":
+        raise ValueError("the descent mode needs an NRPA algorithm")
+    # cada etapa continua da política e da coloração da anterior, que o
+    # solve reduzido não devolve; checkpoint e target_score valem para
+    # uma única busca
+    if kwargs.get("reduce") or kwargs.get("checkpoint") is not None or \
+            kwargs.get("target_score") is not None:
+        raise ValueError("the descent mode cannot be combined with reduce, checkpoint or target_score")
+    if deadline is None:
+        deadline = Deadline(time_limit)
+    semente = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    policy = sequence = None
+    etapas = []
+    while True:
+        resultado = solve(graph, k, algorithm, deadline=deadline, seed=semente.spawn(1)[0],
+                          policy=policy, initial_sequence=sequence, **kwargs)
+        etapas.append((k, resultado))
+        if not resultado.valid or k == 1 or deadline.expired():
+            return etapas
+        policy, sequence = remove_cor(graph, resultado.sequence, resultado.policy)
+        k -= 1
+
+# solve() como gerador: devolve os Eventos de melhora à medida que
+# acontecem (a busca roda em outra thread) e, ao final, o Resultado como
+# valor de retorno do gerador. Fechar o gerador antes do fim cancela a
+# busca.
+def iter_solve(graph, k, **kwargs):
+    eventos = queue.Queue()
+    deadline = kwargs.pop("deadline", None)
+    if deadline is None:
+        deadline = Deadline(kwargs.pop("time_limit", None))
+    callback = kwargs.pop("callback", None)
+
+    def repassa(evento):
+        eventos.put(evento)
+        return callback(evento) if callback is not None else False
+
+    # o Resultado ou a exceção levantada por solve(), repassada ao
+    # chamador depois que a thread termina
+    resultado = []
+    erro = []
+    def executa():
+        try:
+            resultado.append(solve(graph, k, deadline=deadline, callback=repassa, **kwargs))
+        except BaseException as e:
+            erro.append(e)
+        finally:
+            eventos.put(None)
+
+    thread = threading.Thread(target=executa, daemon=True)
+    thread.start()
+    try:
+        while (evento := eventos.get()) is not None:
+            yield evento
+    finally:
+        deadline.cancel()
+        thread.join()
+    if erro:
+        raise erro[0]
+    return resultado[0]
+
+# linha de resultado usada nos experimentos, em partes de largura fixa
+def linha_resultado(fname, graph, max_colors, resultado: Resultado):
+    n = graph.number_of_nodes()
+    m = graph.number_of_edges()
+    score = resultado.score
+    output = []
+
+    output.append(f'{os.path.basename(fname):<25} {max_colors:<4} ')
+    output.append(f'{n:<6} {m:<6} ')
+
+    if resultado.valid:
+        output.append(f'{score:<6} yes ')
+    else:
+        output.append(f'{score:<6} no  ')
+    if resultado.time_expired:
+        output.append('limite de tempo ')
+    else:
+        output.append('.               ')
+    output.append(f'{resultado.seconds:>8.2f}')
+    return output
+
+# imprime a linha de resultado (e detalhes com verbose)
+def imprime_resultado(fname, graph, max_colors, resultado: Resultado, verbose=False):
+    n = graph.number_of_nodes()
+    m = graph.number_of_edges()
+    score = resultado.score
+    sequencia = resultado.sequence
+    output = linha_resultado(fname, graph, max_colors, resultado)
+
+    print(''.join(output), flush=True)
+
+    # resposta longa (verbose)
+    if verbose:
+        print(output, flush=True)
+        print(f'Nodes: {n}, edges: {m}\n')
+        cores = [move[1] for move in sequencia]
+        print(f"Cores usadas: {len(set(cores))}")
+        print(f"Numero de vezes que nrpa foi executada: {resultado.counter}")
+        print(f"Melhor pontuação: {score}")
+        if resultado.spawn_key:
+            print(f"Semente: {resultado.seed}, spawn_key {resultado.spawn_key}")
+        else:
+            print(f"Semente: {resultado.seed}")
+        if resultado.lower_bound is not None:
+            print(f"Limite inferior (clique): {resultado.lower_bound}")
+        if resultado.reducao is not None:
+            print(f"Vértices no núcleo reduzido: {resultado.reducao:.1%}")
+        if resultado.stats is not None:
+            print(resultado.stats)
+        sequencia = sequencia[np.argsort(sequencia[:, 0])].tolist()
+        print(f"Melhor sequência: {sequencia}")